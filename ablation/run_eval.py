@@ -18,10 +18,11 @@ _LOCAL_WHEEL = ROOT / "en_core_web_sm-3.7.1-py3-none-any.whl"
 def _ensure_spacy_model() -> None:
     """Install the bundled spaCy model wheel if the model is missing."""
     try:
-        import spacy  # type: ignore
+        import spacy.util  # type: ignore
 
-        spacy.load(_SPACY_MODEL)
-        return
+        # metadata-only check; avoids loading the whole pipeline from disk just to probe for it
+        if spacy.util.is_package(_SPACY_MODEL):
+            return
     except Exception:
         pass
 
@@ -54,14 +55,33 @@ def _ensure_spacy_model() -> None:
         ) from exc
 
 
+def _set_model_residency(keep_alive: int) -> None:
+    """Best-effort pin/unload; an unreachable server is left for the harness to report per query."""
+    # Imported lazily so the client picks up the OLLAMA_MODEL and OLLAMA_KEEP_ALIVE set in main().
+    from agentic.ollama_client import OllamaUnavailableError, set_model_residency
+
+    try:
+        set_model_residency(keep_alive)
+    except OllamaUnavailableError as exc:
+        print(f"WARNING: could not set model keep_alive={keep_alive}: {exc}", file=sys.stderr)
+
+
 def main() -> None:
     _ensure_spacy_model()
     os.environ.setdefault("OLLAMA_MODEL", "gemma3:1b")
+    # Every generate call resets the server's keep-alive timer, so keep sending -1 while pinned.
+    os.environ.setdefault("OLLAMA_KEEP_ALIVE", "-1")
     os.environ.pop("MOCK_OLLAMA", None)
     os.environ.pop("ABLATION_DISABLE_NER", None)
     os.environ.pop("ABLATION_DISABLE_VALIDATION", None)
     os.environ.pop("ABLATION_DISABLE_GRAPHQL", None)
-    runpy.run_path("tests/run_eval_30.py", run_name="__main__")
+
+    # Pin the weights for the whole run so idle gaps between queries never trigger a reload.
+    _set_model_residency(-1)
+    try:
+        runpy.run_path("tests/run_eval_30.py", run_name="__main__")
+    finally:
+        _set_model_residency(0)
 
 
 if __name__ == "__main__":
@@ -1,12 +1,77 @@
+import asyncio
+import hashlib
 import json
 import os
-import shutil
-import subprocess
-from typing import Any, Dict
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence
+
+from agentic.response_parsing import extract_json_block
+from common.json_compat import dumps, loads
+
+try:  # pragma: no cover - optional when running with MOCK_OLLAMA=1
+    import requests
+except ImportError:  # pragma: no cover - surfaced lazily in run_ollama
+    requests = None
 
 _DEFAULT_MODEL = os.environ.get("OLLAMA_MODEL", "gpt-oss:20b")
 
 
+def _parse_keep_alive(raw: str) -> int | str:
+    # Ollama takes either a duration string ("10m") or a number of seconds (-1 pins the model).
+    try:
+        return int(raw)
+    except ValueError:
+        return raw
+
+
+_KEEP_ALIVE = _parse_keep_alive(os.environ.get("OLLAMA_KEEP_ALIVE", "10m"))
+# Keep in step with the server's OLLAMA_NUM_PARALLEL so batched prompts are decoded concurrently.
+_NUM_PARALLEL = max(1, int(os.environ.get("OLLAMA_NUM_PARALLEL", "4")))
+
+
+def _resolve_host(raw: str) -> str:
+    host = raw.strip().rstrip("/")
+    if "://" not in host:
+        host = f"http://{host}"
+    return host
+
+
+_OLLAMA_HOST = _resolve_host(os.environ.get("OLLAMA_HOST", "http://localhost:11434"))
+_CACHE_DIR = Path(os.environ.get("OLLAMA_CACHE_DIR", ".cache/ollama"))
+
+# One pooled session per process so every call reuses the same keep-alive connection.
+_SESSION = requests.Session() if requests is not None else None
+
+
+# Single source of truth for MOCK_OLLAMA=1 runs; keys are matched (in order) against the lower-cased question.
+_MOCK_RESPONSES: Dict[str, List[Dict[str, str]]] = {
+    "active cardiology": [
+        {"field_path": "Affiliation.status", "operator": "=", "value": "ACTIVE"},
+        {"field_path": "Specialty.name", "operator": "=", "value": "Cardiology"},
+        {"field_path": "Facility.location.city", "operator": "=", "value": "Los Angeles"},
+        {"field_path": "Facility.type", "operator": "=", "value": "HOSPITAL"},
+        {"field_path": "Facility.plansAccepted.name", "operator": "=", "value": "Blue Shield PPO"},
+    ],
+    "inactive oncology": [
+        {"field_path": "Affiliation.status", "operator": "=", "value": "INACTIVE"},
+        {"field_path": "Specialty.name", "operator": "=", "value": "Oncology"},
+        {"field_path": "Facility.location.city", "operator": "=", "value": "Seattle"},
+        {"field_path": "Facility.type", "operator": "=", "value": "CLINIC"},
+    ],
+    "cigna choice": [
+        {"field_path": "Facility.location.state", "operator": "=", "value": "TX"},
+        {"field_path": "Facility.plansAccepted.name", "operator": "=", "value": "Cigna Choice"},
+    ],
+    "austin": [
+        {"field_path": "Facility.location.city", "operator": "=", "value": "Austin"},
+        {"field_path": "Appointment.availabilityStatus", "operator": "=", "value": "OPEN"},
+        {"field_path": "Facility.type", "operator": "=", "value": "URGENT_CARE"},
+    ],
+}
+
+
 class OllamaUnavailableError(RuntimeError):
     pass
 
@@ -17,14 +82,15 @@ def _extract_question(prompt: str) -> str:
         return ""
     payload_str = prompt.split(marker, 1)[-1].strip()
     try:
-        data = json.loads(payload_str)
+        data = loads(payload_str)
         return data.get("question", "")
     except json.JSONDecodeError:
         return ""
 
 
-def _mock_completion(prompt: str) -> str:
-    question = _extract_question(prompt).lower()
+@lru_cache(maxsize=256)
+def _mock_payload(question: str) -> str:
+    # Memoized per question: retries and repeated ablation runs resolve the same mock once.
     payload = None
     for key, filters in _MOCK_RESPONSES.items():
         if key in question:
@@ -32,24 +98,175 @@ def _mock_completion(prompt: str) -> str:
             break
     if payload is None:
         payload = _MOCK_RESPONSES.get("active cardiology")
-    return json.dumps({"filters": payload})
+    return dumps({"filters": payload})
+
+
+def _mock_completion(prompt: str) -> str:
+    return _mock_payload(_extract_question(prompt).lower())
+
+
+def _read_until_json_closes(lines: Iterable[bytes]) -> str:
+    """Collect streamed chunks until the first top-level JSON object closes, dropping any trailing chatter.
+
+    Braces inside JSON string literals are ignored, so values such as "a}b" do not end the object early.
+    """
+    chunks: List[str] = []
+    depth = 0
+    in_string = False
+    escaped = False
+    for line in lines:
+        if not line:
+            continue
+        data = loads(line)
+        if "error" in data:
+            raise OllamaUnavailableError(f"Ollama generation failed: {data['error']}")
+        piece = data.get("response", "")
+        for idx, ch in enumerate(piece):
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif depth == 0:
+                # prose before the object may contain stray quotes; only a brace opens tracking
+                if ch == "{":
+                    depth = 1
+            elif ch == '"':
+                in_string = True
+            elif ch == "{":
+                depth += 1
+            elif ch == "}":
+                depth -= 1
+                if depth == 0:
+                    chunks.append(piece[: idx + 1])
+                    return "".join(chunks)
+        chunks.append(piece)
+        if data.get("done"):
+            break
+    return "".join(chunks)
+
+
+def _cache_path(prompt: str, model: str) -> Path:
+    digest = hashlib.sha256(f"{model}\0{prompt}".encode("utf-8")).hexdigest()
+    return _CACHE_DIR / f"{digest}.json"
+
+
+def _cache_get(prompt: str, model: str) -> str | None:
+    try:
+        with open(_cache_path(prompt, model), "r", encoding="utf-8") as f:
+            return json.load(f)["response"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _cache_put(prompt: str, model: str, response: str) -> None:
+    _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # write-then-rename so concurrent callers never read a half-written entry
+    fd, tmp_path = tempfile.mkstemp(dir=_CACHE_DIR, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"model": model, "response": response}, f, ensure_ascii=False)
+    os.replace(tmp_path, _cache_path(prompt, model))
 
 
 def run_ollama(prompt: str, model: str = _DEFAULT_MODEL, timeout: int = None) -> str:
     if os.environ.get("MOCK_OLLAMA") == "1":
         return _mock_completion(prompt)
 
-    executable = shutil.which("ollama")
-    if executable is None:
-        raise OllamaUnavailableError("Ollama CLI not found on PATH. Install Ollama or set MOCK_OLLAMA=1 for dry runs.")
-
-    proc = subprocess.run(
-        [executable, "run", model],
-        input=prompt.encode("utf-8"),
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        timeout=timeout,
-        check=True,
-    )
-    output = proc.stdout.decode("utf-8").strip()
+    if os.environ.get("OLLAMA_CACHE") != "1":
+        return _generate(prompt, model, timeout)
+
+    cached = _cache_get(prompt, model)
+    if cached is not None:
+        return cached
+    output = _generate(prompt, model, timeout)
+    if _cacheable(output):
+        _cache_put(prompt, model, output)
     return output
+
+
+def _cacheable(output: str) -> bool:
+    # Only replay completions that contain a JSON object; empty or chatty replies get regenerated next run.
+    return bool(output) and extract_json_block(output) is not None
+
+
+def _post_generate(body: Dict[str, Any], timeout: int | None, stream: bool):
+    if _SESSION is None:
+        raise OllamaUnavailableError("The 'requests' package is required to reach Ollama. Install it or set MOCK_OLLAMA=1 for dry runs.")
+    try:
+        return _SESSION.post(f"{_OLLAMA_HOST}/api/generate", json=body, timeout=timeout, stream=stream)
+    except requests.ConnectionError as exc:
+        raise OllamaUnavailableError(
+            f"Ollama server not reachable at {_OLLAMA_HOST}. Start 'ollama serve', set OLLAMA_HOST, or set MOCK_OLLAMA=1 for dry runs."
+        ) from exc
+    except requests.Timeout as exc:
+        raise OllamaUnavailableError(f"Ollama at {_OLLAMA_HOST} did not respond within {timeout}s.") from exc
+
+
+def _check_status(response) -> None:
+    """Raise OllamaUnavailableError carrying Ollama's own ``error`` message for non-2xx replies."""
+    if response.ok:
+        return
+    try:
+        detail = response.json().get("error")
+    except ValueError:
+        detail = None
+    raise OllamaUnavailableError(
+        f"Ollama returned HTTP {response.status_code}: {detail or response.reason or 'no details'}"
+    )
+
+
+def _generate(prompt: str, model: str, timeout: int | None) -> str:
+    body: Dict[str, Any] = {
+        "model": model,
+        "prompt": prompt,
+        "stream": True,
+        "keep_alive": _KEEP_ALIVE,
+    }
+    response = _post_generate(body, timeout, stream=True)
+    # Closing the response early disconnects the stream, which stops generation server-side.
+    with response:
+        _check_status(response)
+        try:
+            return _read_until_json_closes(response.iter_lines()).strip()
+        except (requests.ConnectionError, requests.Timeout) as exc:
+            # a read timeout mid-stream surfaces from iter_lines, not from post()
+            raise OllamaUnavailableError(f"Ollama stream from {_OLLAMA_HOST} was interrupted: {exc}") from exc
+
+
+def set_model_residency(keep_alive: int | str, model: str = _DEFAULT_MODEL, timeout: int = None) -> None:
+    """Load the model without generating (keep_alive=-1 pins it, 0 unloads it). No-op when mocked.
+
+    Every failure, including a missing model or a timeout, raises ``OllamaUnavailableError``.
+    """
+    if os.environ.get("MOCK_OLLAMA") == "1":
+        return
+    response = _post_generate({"model": model, "keep_alive": keep_alive}, timeout, stream=False)
+    with response:
+        _check_status(response)
+
+
+async def _arun(prompt: str, semaphore: asyncio.Semaphore, model: str, timeout: int | None) -> str:
+    async with semaphore:
+        return await asyncio.to_thread(run_ollama, prompt, model, timeout)
+
+
+def run_ollama_many(
+    prompts: Sequence[str], model: str = _DEFAULT_MODEL, timeout: int = None, return_exceptions: bool = False
+) -> List[str | BaseException]:
+    """Dispatch independent prompts concurrently, returning completions in input order.
+
+    With ``return_exceptions`` a failed prompt yields its exception in place instead of
+    failing the whole batch, mirroring ``asyncio.gather``.
+    """
+    if not prompts:
+        return []
+
+    async def _gather() -> List[str | BaseException]:
+        semaphore = asyncio.Semaphore(_NUM_PARALLEL)
+        return await asyncio.gather(
+            *(_arun(p, semaphore, model, timeout) for p in prompts), return_exceptions=return_exceptions
+        )
+
+    return list(asyncio.run(_gather()))
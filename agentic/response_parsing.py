@@ -0,0 +1,18 @@
+"""Helpers for pulling JSON out of raw LLM completions."""
+
+
+def extract_json_block(raw: str) -> str | None:
+    """Return the first balanced ``{...}`` span in ``raw``, or None when there is none."""
+    start = raw.find("{")
+    if start == -1:
+        return None
+    depth = 0
+    for idx in range(start, len(raw)):
+        ch = raw[idx]
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return raw[start : idx + 1]
+    return None
@@ -3,9 +3,12 @@
 import json
 import re
 import textwrap
-from typing import Any, Dict, List, TypedDict
+from typing import Any, Dict, List, Tuple, TypedDict
 
-from agentic.ollama_client import run_ollama
+from agentic.ollama_client import run_ollama, run_ollama_many
+from agentic.response_parsing import extract_json_block
+from common.json_compat import dumps, loads
+from ir.schema_index import path_exists, schema_cache
 
 try:  # pragma: no cover - import guard for optional dependency clarity
     from langgraph.graph import StateGraph, END
@@ -71,8 +74,19 @@ FEW_SHOTS = textwrap.dedent(
     """
 )
 
+BATCH_INSTRUCTIONS = textwrap.dedent(
+    """
+    Batch mode: the payload lists several independent questions under "questions".
+    Answer each one separately using the rules above and respond with ONLY this JSON:
+    {"results": [{"filters": [...]}, {"filters": [...]}]}
+    Return exactly one entry per question, in the same order as the payload.
+    """
+)
+
 MAX_ATTEMPTS = 3
 
+_COMMENT_RE = re.compile(r"//.*?$", re.MULTILINE)
+
 
 class AgentState(TypedDict, total=False):
     question: str
@@ -87,6 +101,8 @@ class AgentState(TypedDict, total=False):
 
 
 _GRAPH = None
+# First-attempt completions fetched ahead of time by prefetch_filters, keyed by prompt.
+_PREFETCHED: Dict[str, str] = {}
 
 
 def _format_schema_fields(schema: Dict[str, Any]) -> str:
@@ -121,93 +137,104 @@ def _strip_markdown_fences(raw: str) -> str:
 
 
 def _strip_inline_comments(raw: str) -> str:
-    return re.sub(r"//.*?$", "", raw, flags=re.MULTILINE)
+    return _COMMENT_RE.sub("", raw)
 
 
-def _extract_json_block(raw: str) -> str | None:
-    start = raw.find("{")
-    if start == -1:
-        return None
-    depth = 0
-    for idx in range(start, len(raw)):
-        ch = raw[idx]
-        if ch == "{":
-            depth += 1
-        elif ch == "}":
-            depth -= 1
-            if depth == 0:
-                return raw[start : idx + 1]
-    return None
+def _schema_prompt_parts(schema: Dict[str, Any]) -> Tuple[str, str]:
+    """Return the schema-only prompt prefix and schema JSON, computed once per schema object."""
+    cache = schema_cache(schema)
+    if "prompt_parts" not in cache:
+        prefix = (
+            f"{PROMPT_HEADER}\n{INSTRUCTIONS}\n{_schema_fields_text(schema)}\n{FEW_SHOTS}\n###PAYLOAD###\n"
+        )
+        cache["prompt_parts"] = (prefix, dumps(schema))
+    return cache["prompt_parts"]
 
 
-def _build_prompt(state: AgentState) -> str:
-    schema_fields = _format_schema_fields(state["schema"])
-    payload = {
-        "question": state["question"],
-        "schema": state["schema"],
-        "mentions": state["mentions"],
-        "invalid_paths": state.get("invalid_paths", []),
-        "feedback": state.get("feedback", ""),
-    }
+def _schema_fields_text(schema: Dict[str, Any]) -> str:
+    cache = schema_cache(schema)
+    if "fields_text" not in cache:
+        cache["fields_text"] = _format_schema_fields(schema)
+    return cache["fields_text"]
+
+
+def _build_batch_prompt(
+    texts: List[str], schema: Dict[str, Any], mentions_list: List[List[Dict[str, Any]]]
+) -> str:
+    _, schema_json = _schema_prompt_parts(schema)
+    questions = dumps([{"question": t, "mentions": m} for t, m in zip(texts, mentions_list)])
     return (
-        f"{PROMPT_HEADER}\n{INSTRUCTIONS}\n{schema_fields}\n{FEW_SHOTS}\n###PAYLOAD###\n"
-        f"{json.dumps(payload, ensure_ascii=False)}"
+        f"{PROMPT_HEADER}\n{INSTRUCTIONS}\n{BATCH_INSTRUCTIONS}\n{_schema_fields_text(schema)}\n{FEW_SHOTS}\n"
+        f'###PAYLOAD###\n{{"questions":{questions},"schema":{schema_json}}}'
+    )
+
+
+def _build_prompt(state: AgentState) -> str:
+    prefix, schema_json = _schema_prompt_parts(state["schema"])
+    question = dumps(state["question"])
+    # Only the per-call fields are serialized here; splice them around the cached schema JSON.
+    dynamic = dumps(
+        {
+            "mentions": state["mentions"],
+            "invalid_paths": state.get("invalid_paths", []),
+            "feedback": state.get("feedback", ""),
+        }
     )
+    return f'{prefix}{{"question":{question},"schema":{schema_json},{dynamic[1:]}'
+
+
+def _try_json_object(candidate: str | None) -> Dict[str, Any] | None:
+    # Only attempt a decode when the text can plausibly be a JSON object.
+    if not candidate or candidate.lstrip()[:1] != "{":
+        return None
+    try:
+        parsed = loads(candidate)
+    except json.JSONDecodeError:  # pragma: no cover - agent formatting edge cases
+        return None
+    return parsed if isinstance(parsed, dict) else None
 
 
 def _parse_response(raw: str) -> Dict[str, Any]:
-    candidates = [raw]
+    # Stages run cheapest first and each is only computed when the previous one failed.
+    parsed = _try_json_object(raw)
+    if parsed is not None:
+        return parsed
     fenced = _strip_markdown_fences(raw)
-    if fenced not in candidates:
-        candidates.append(fenced)
+    if fenced != raw:
+        parsed = _try_json_object(fenced)
+        if parsed is not None:
+            return parsed
     uncommented = _strip_inline_comments(fenced)
-    if uncommented not in candidates:
-        candidates.append(uncommented)
-    json_block = _extract_json_block(uncommented)
-    if json_block and json_block not in candidates:
-        candidates.append(json_block)
+    if uncommented != fenced:
+        parsed = _try_json_object(uncommented)
+        if parsed is not None:
+            return parsed
+    json_block = extract_json_block(uncommented)
+    if json_block != uncommented:
+        parsed = _try_json_object(json_block)
+        if parsed is not None:
+            return parsed
 
-    last_error: Exception | None = None
-    for candidate in candidates:
-        try:
-            return json.loads(candidate)
-        except json.JSONDecodeError as exc:  # pragma: no cover - agent formatting edge cases
-            last_error = exc
-
-    raise ValueError(f"Agent response was not JSON: {raw}") from last_error
+    raise ValueError(f"Agent response was not JSON: {raw}")
 
 
 def _field_path_exists(field_path: str, schema: Dict[str, Any]) -> bool:
-    parts = field_path.split(".")
-    if len(parts) < 2:
-        return False
-    types = schema.get("types", {})
-    current_type = parts[0]
-    if current_type not in types:
+    if "." not in field_path:
         return False
-
-    fields = types[current_type].get("fields", {})
-    for name in parts[1:]:
-        if name not in fields:
-            return False
-        field_type = fields[name]
-        base_type = field_type[:-2] if field_type.endswith("[]") else field_type
-        if base_type in types:
-            fields = types[base_type].get("fields", {})
-        else:
-            fields = {}
-    return True
+    return path_exists(schema, field_path)
 
 
 def _generate_filters(state: AgentState) -> AgentState:
     prompt = _build_prompt(state)
-    raw = run_ollama(prompt)
+    raw = _PREFETCHED.pop(prompt, None)
+    if raw is None:
+        raw = run_ollama(prompt)
     attempts = state.get("attempts", 0) + 1
 
+    # Nodes return only the keys they change; LangGraph merges them, so the schema is never re-copied.
     try:
         parsed = _parse_response(raw)
         return {
-            **state,
             "filters": parsed.get("filters", []),
             "raw_response": raw,
             "attempts": attempts,
@@ -216,23 +243,21 @@ def _generate_filters(state: AgentState) -> AgentState:
         }
     except ValueError:
         # Force another iteration with explicit feedback so the model removes chatter.
-        return {
-            **state,
+        update: AgentState = {
             "filters": [],
             "raw_response": raw,
             "attempts": attempts,
-            "invalid_paths": ["<non-json-response>"] if not state.get("force_retry") else state.get("invalid_paths", []),
             "feedback": "Your previous response was not valid JSON. Respond with ONLY JSON matching the schema instructions.",
             "force_retry": True,
         }
+        if not state.get("force_retry"):
+            update["invalid_paths"] = ["<non-json-response>"]
+        return update
 
 
-def _validate_filters(state: AgentState) -> AgentState:
-    if state.get("force_retry"):
-        return state
-
-    schema = state["schema"]
-    filters = state.get("filters", [])
+def _clean_filters(
+    filters: List[Dict[str, Any]], schema: Dict[str, Any]
+) -> Tuple[List[Dict[str, Any]], List[str]]:
     invalid = []
     cleaned: List[Dict[str, Any]] = []
 
@@ -247,9 +272,14 @@ def _validate_filters(state: AgentState) -> AgentState:
             "operator": f.get("operator", "="),
             "value": val,
         })
+    return cleaned, invalid
 
-    new_state: AgentState = {
-        **state,
+
+def _validate_filters(state: AgentState) -> AgentState:
+    # Only reached when force_retry is unset; _generation_router sends non-JSON output elsewhere.
+    cleaned, invalid = _clean_filters(state.get("filters", []), state["schema"])
+
+    return {
         "filters": cleaned,
         "invalid_paths": invalid,
         "feedback": "" if not invalid else (
@@ -258,23 +288,34 @@ def _validate_filters(state: AgentState) -> AgentState:
             + ". Use only Type.field paths listed in the schema reference."
         ),
     }
-    return new_state
 
 
 def _validation_router(state: AgentState) -> str:
-    if state.get("force_retry") and state.get("attempts", 0) < MAX_ATTEMPTS:
-        return "retry"
+    # force_retry states never reach validate; _generation_router handles them.
     if state.get("invalid_paths") and state.get("attempts", 0) < MAX_ATTEMPTS:
         return "retry"
     return "complete"
 
 
+def _generation_router(state: AgentState) -> str:
+    # Non-JSON output has nothing to validate, so loop straight back to generate.
+    if not state.get("force_retry"):
+        return "validate"
+    if state.get("attempts", 0) < MAX_ATTEMPTS:
+        return "retry"
+    return "complete"
+
+
 def _build_graph():
     builder = StateGraph(AgentState)
     builder.add_node("generate", _generate_filters)
     builder.add_node("validate", _validate_filters)
     builder.set_entry_point("generate")
-    builder.add_edge("generate", "validate")
+    builder.add_conditional_edges(
+        "generate",
+        _generation_router,
+        {"validate": "validate", "retry": "generate", "complete": END},
+    )
     builder.add_conditional_edges(
         "validate",
         _validation_router,
@@ -290,9 +331,8 @@ def _get_graph():
     return _GRAPH
 
 
-def infer_filters(text: str, schema: Dict[str, Any], mentions: List[Dict[str, Any]]) -> List[Dict[str, str]]:
-    graph = _get_graph()
-    initial_state: AgentState = {
+def _initial_state(text: str, schema: Dict[str, Any], mentions: List[Dict[str, Any]]) -> AgentState:
+    return {
         "question": text,
         "schema": schema,
         "mentions": mentions,
@@ -303,6 +343,28 @@ def infer_filters(text: str, schema: Dict[str, Any], mentions: List[Dict[str, An
         "force_retry": False,
     }
 
+
+def prefetch_filters(
+    texts: List[str], schema: Dict[str, Any], mentions_list: List[List[Dict[str, Any]]]
+) -> None:
+    """Issue every first-attempt prompt in one concurrent batch.
+
+    The completions are consumed by the next matching ``infer_filters`` call; retries that
+    need validator feedback, and prompts whose batched call failed, still go through
+    ``run_ollama`` one at a time.
+    """
+    prompts = [_build_prompt(_initial_state(t, schema, m)) for t, m in zip(texts, mentions_list)]
+    pending = [p for p in dict.fromkeys(prompts) if p not in _PREFETCHED]
+    # A failed prompt is left out so only that question falls back to its own run_ollama call.
+    for prompt, raw in zip(pending, run_ollama_many(pending, return_exceptions=True)):
+        if not isinstance(raw, BaseException):
+            _PREFETCHED[prompt] = raw
+
+
+def infer_filters(text: str, schema: Dict[str, Any], mentions: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    graph = _get_graph()
+    initial_state = _initial_state(text, schema, mentions)
+
     result: AgentState = graph.invoke(initial_state)
 
     if result.get("invalid_paths"):
@@ -312,3 +374,36 @@ def infer_filters(text: str, schema: Dict[str, Any], mentions: List[Dict[str, An
         )
 
     return result.get("filters", [])
+
+
+def infer_filters_batch(
+    texts: List[str], schema: Dict[str, Any], mentions_list: List[List[Dict[str, Any]]]
+) -> List[List[Dict[str, str]]]:
+    """Infer filters for several questions with one LLM call.
+
+    Items whose batched answer is missing or fails validation fall back to ``infer_filters``,
+    which raises ``ValueError`` exactly as it does for single questions.
+    """
+    if len(texts) != len(mentions_list):
+        raise ValueError(f"Got {len(texts)} questions but {len(mentions_list)} mention lists")
+    if not texts:
+        return []
+
+    raw = run_ollama(_build_batch_prompt(texts, schema, mentions_list))
+    try:
+        entries = _parse_response(raw).get("results")
+    except ValueError:
+        entries = None
+    if not isinstance(entries, list) or len(entries) != len(texts):
+        entries = [None] * len(texts)
+
+    results: List[List[Dict[str, str]]] = []
+    for text, mentions, entry in zip(texts, mentions_list, entries):
+        filters = entry.get("filters") if isinstance(entry, dict) else None
+        if isinstance(filters, list) and all(isinstance(f, dict) for f in filters):
+            cleaned, invalid = _clean_filters(filters, schema)
+            if not invalid:
+                results.append(cleaned)
+                continue
+        results.append(infer_filters(text, schema, mentions))
+    return results
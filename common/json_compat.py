@@ -0,0 +1,17 @@
+"""JSON helpers that use orjson when it is installed and the stdlib otherwise."""
+
+import json
+from typing import Any
+
+try:  # pragma: no cover - orjson is an optional speedup
+    import orjson
+
+    def dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+    loads = orjson.loads
+except ImportError:  # pragma: no cover - stdlib fallback with the same compact layout
+    def dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+    loads = json.loads
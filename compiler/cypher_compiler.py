@@ -1,7 +1,12 @@
 import json
 import re
+import string
+from functools import lru_cache
 from typing import Dict, List, Sequence, Tuple
 
+from common.json_compat import loads as _json_loads
+from ir.schema_index import schema_cache
+
 _OPERATOR_MAP = {
     'eq': '=',
     'ne': '<>',
@@ -13,6 +18,15 @@ _OPERATOR_MAP = {
     'in': 'IN'
 }
 
+_IDENT_CHARS = frozenset(string.ascii_letters + string.digits + '_')
+_JSON_START_CHARS = frozenset('"[{-0123456789tfn')
+# json.loads accepts these but orjson does not, so decode them here to keep either backend consistent
+_NON_FINITE = {'NaN': float('nan'), 'Infinity': float('inf'), '-Infinity': float('-inf')}
+_ROOT_QUERY_RE = re.compile(r'query\s*\{\s*(\w+)\s*\(')
+_SNAKE_RE = re.compile(r'([a-z0-9])([A-Z])')
+
+_RETURN_CLAUSE_CACHE_SIZE = 256
+
 
 class CypherBuilder:
     """Build Cypher MATCH/WHERE clauses deterministically."""
@@ -22,9 +36,12 @@ class CypherBuilder:
         self.types = schema.get('types', {})
         if root_type not in self.types:
             raise ValueError(f"Unknown root type '{root_type}' in schema")
-        self.alias_map: Dict[Tuple[str, ...], Tuple[str, str]] = {(): ('root', root_type)}
+        _lowercase_fields(self.types)
+        # keyed by _key(relation_fields): one string hash per lookup instead of hashing a tuple
+        self.alias_map: Dict[str, Tuple[str, str]] = {self._key(()): ('root', root_type)}
         self.alias_counter = 1
-        self.match_clauses: List[str] = []
+        # MATCH lines in emission order, seeded with the root pattern; build() only appends the tail
+        self._parts: List[str] = [f"MATCH ({self.alias_map[self._key(())][0]}:{root_type})"]
         self.conditions: List[str] = []
 
     def add_condition(self, path_fields: Sequence[str], operator: str, value):
@@ -42,13 +59,12 @@ class CypherBuilder:
         self.conditions.append(condition)
 
     def build(self, select_fields: Sequence[str]) -> str:
-        root_alias, root_type = self.alias_map[()]
-        clauses = [f"MATCH ({root_alias}:{root_type})"]
-        clauses.extend(self.match_clauses)
+        root_alias, root_type = self.alias_map[self._key(())]
+        parts = list(self._parts)
         if self.conditions:
-            clauses.append("WHERE " + " AND ".join(self.conditions))
-        clauses.append(_render_return_clause(select_fields, root_alias, root_type, self.types))
-        return "\n".join(clauses)
+            parts.append("WHERE " + " AND ".join(self.conditions))
+        parts.append(_render_return_clause(select_fields, root_alias, root_type, self.types))
+        return "\n".join(parts)
 
     def _render_condition(self, alias: str, field: str, operator: str, value_literal: str) -> str:
         if operator == 'IN' and not value_literal.startswith('['):
@@ -56,11 +72,14 @@ class CypherBuilder:
             value_literal = f"[{value_literal}]"
         return f"{alias}.{field} {operator} {value_literal}"
 
+    @staticmethod
+    def _key(relation_fields: Sequence[str]) -> str:
+        return "/".join(relation_fields)
+
     def _ensure_path(self, relation_fields: Tuple[str, ...]) -> Tuple[str, str]:
-        if relation_fields in self.alias_map:
-            return self.alias_map[relation_fields]
-        if not relation_fields:
-            return self.alias_map[()]
+        key = self._key(relation_fields)
+        if key in self.alias_map:
+            return self.alias_map[key]
         parent_tuple = relation_fields[:-1]
         parent_alias, parent_type = self._ensure_path(parent_tuple)
         field_name = relation_fields[-1]
@@ -71,10 +90,10 @@ class CypherBuilder:
         alias = f"n{self.alias_counter}"
         self.alias_counter += 1
         rel_label = _relationship_label(parent_type, actual_field)
-        self.match_clauses.append(
+        self._parts.append(
             f"MATCH ({parent_alias}:{parent_type})-[:{rel_label}]->({alias}:{base_type})"
         )
-        self.alias_map[relation_fields] = (alias, base_type)
+        self.alias_map[key] = (alias, base_type)
         return alias, base_type
 
 
@@ -112,25 +131,54 @@ def _parse_filters(where_block: str) -> List[Tuple[List[str], str, object]]:
 
 def _parse_filter_line(line: str) -> Tuple[List[str], str, object]:
     # capture nested field names ending with operator token, e.g., affiliations, facility, eq
-    tokens = re.findall(r'([A-Za-z0-9_]+)\s*:', line)
+    tokens: List[str] = []
+    value_start = 0
+    i = 0
+    n = len(line)
+    while i < n:
+        ch = line[i]
+        if ch == '"':
+            # quoted values only follow the operator; never scan them for identifiers
+            break
+        if ch not in _IDENT_CHARS:
+            i += 1
+            continue
+        start = i
+        while i < n and line[i] in _IDENT_CHARS:
+            i += 1
+        j = i
+        while j < n and line[j].isspace():
+            j += 1
+        if j < n and line[j] == ':':
+            tokens.append(line[start:i])
+            value_start = j + 1
+            i = j + 1
     if len(tokens) < 2:
         raise ValueError(f"Unable to parse filter line: {line}")
     operator = tokens[-1]
     path_fields = tokens[:-1]
-    value_segment = line.split(f"{operator}:", 1)[1].strip()
-    value_raw = value_segment.split('}', 1)[0].strip().rstrip(',')
+    value_end = line.find('}', value_start)
+    if value_end == -1:
+        value_end = n
+    value_raw = line[value_start:value_end].strip().rstrip(',')
     value = _parse_value(value_raw)
     return path_fields, operator, value
 
 
 def _parse_value(value_raw: str):
-    try:
-        return json.loads(value_raw)
-    except json.JSONDecodeError:
-        lowered = value_raw.lower()
-        if lowered in {'true', 'false'}:
-            return lowered == 'true'
-        return value_raw.strip('"')
+    non_finite = _NON_FINITE.get(value_raw)
+    if non_finite is not None:
+        return non_finite
+    # only hand the JSON decoder values that can start a JSON literal; bare words skip the exception path
+    if value_raw[:1] in _JSON_START_CHARS:
+        try:
+            return _json_loads(value_raw)
+        except json.JSONDecodeError:
+            pass
+    lowered = value_raw.lower()
+    if lowered in {'true', 'false'}:
+        return lowered == 'true'
+    return value_raw.strip('"')
 
 
 def _parse_selection_fields(selection_block: str) -> List[str]:
@@ -144,7 +192,7 @@ def _parse_selection_fields(selection_block: str) -> List[str]:
 
 
 def _extract_root_query(query: str) -> str:
-    match = re.search(r'query\s*\{\s*(\w+)\s*\(', query)
+    match = _ROOT_QUERY_RE.search(query)
     if not match:
         raise ValueError('Unable to locate root query in GraphQL input')
     return match.group(1)
@@ -195,13 +243,31 @@ def _extract_braced_block(text: str, open_idx: int) -> Tuple[str, int]:
     return text[start:i - 1], i
 
 
+def _types_entry(types: Dict) -> Tuple[Dict[str, Dict[str, Tuple[str, str]]], Dict[Tuple, str]]:
+    # ({type: {lowercased field: (actual field, field type)}}, rendered RETURN clauses)
+    cache = schema_cache(types)
+    entry = cache.get('cypher')
+    if entry is None:
+        index: Dict[str, Dict[str, Tuple[str, str]]] = {}
+        for type_name, type_info in types.items():
+            fields_ci: Dict[str, Tuple[str, str]] = {}
+            for actual, ftype in type_info.get('fields', {}).items():
+                # first declared field wins, matching the previous linear scan
+                fields_ci.setdefault(actual.lower(), (actual, ftype))
+            index[type_name] = fields_ci
+        entry = cache['cypher'] = (index, {})
+    return entry
+
+
+def _lowercase_fields(types: Dict) -> Dict[str, Dict[str, Tuple[str, str]]]:
+    return _types_entry(types)[0]
+
+
 def _resolve_field(type_name: str, field_name: str, types: Dict) -> Tuple[str, str]:
-    type_info = types.get(type_name, {})
-    fields = type_info.get('fields', {})
-    for actual, ftype in fields.items():
-        if actual.lower() == field_name.lower():
-            return actual, ftype
-    raise ValueError(f"Field '{field_name}' not found on type '{type_name}'")
+    match = _lowercase_fields(types).get(type_name, {}).get(field_name.lower())
+    if match is None:
+        raise ValueError(f"Field '{field_name}' not found on type '{type_name}'")
+    return match
 
 
 def _base_type(field_type: str) -> str:
@@ -214,17 +280,34 @@ def _relationship_label(parent_type: str, field_name: str) -> str:
     return f"{_normalize_label(parent_type)}_{_normalize_label(field_name)}"
 
 
+@lru_cache(maxsize=None)
 def _normalize_label(name: str) -> str:
-    snake = re.sub(r'([a-z0-9])([A-Z])', r'\1_\2', name)
+    snake = _SNAKE_RE.sub(r'\1_\2', name)
     return snake.upper()
 
 
 def _render_return_clause(select_fields: Sequence[str], root_alias: str, root_type: str, types: Dict) -> str:
+    # select projections repeat across queries, so memoize the rendered clause per schema
+    _, rendered = _types_entry(types)
+    key = (root_alias, root_type, tuple(select_fields))
+    clause = rendered.get(key)
+    if clause is None:
+        clause = _render_return_clause_uncached(select_fields, root_alias, root_type, types)
+        if len(rendered) < _RETURN_CLAUSE_CACHE_SIZE:
+            rendered[key] = clause
+    return clause
+
+
+def _render_return_clause_uncached(select_fields: Sequence[str], root_alias: str, root_type: str, types: Dict) -> str:
     if not select_fields:
         return f"RETURN DISTINCT {root_alias}"
+    fields_ci = _lowercase_fields(types).get(root_type, {})
     resolved_fields = []
     for field in select_fields:
-        actual_field, _ = _resolve_field(root_type, field, types)
+        match = fields_ci.get(field.lower())
+        if match is None:
+            raise ValueError(f"Field '{field}' not found on type '{root_type}'")
+        actual_field = match[0]
         resolved_fields.append(f"{root_alias}.{actual_field} AS {actual_field}")
     return "RETURN DISTINCT " + ", ".join(resolved_fields)
 
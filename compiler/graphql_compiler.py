@@ -1,5 +1,7 @@
 from collections import deque
 
+from ir.schema_index import schema_cache
+
 
 def _render_value(v):
     # strings quoted
@@ -12,10 +14,10 @@ def _nest_field_parts(parts, value):
     # parts: ['affiliations','facility','location','state'] -> render nested GraphQL input
     if not parts:
         return ''
-    head = parts[0]
-    if len(parts) == 1:
-        return f"{head}: {{ eq: { _render_value(value) } }}"
-    return f"{head}: {{ { _nest_field_parts(parts[1:], value) } }}"
+    chunks = [f"{head}: {{ " for head in parts[:-1]]
+    chunks.append(f"{parts[-1]}: {{ eq: {_render_value(value)} }}")
+    chunks.append(" }" * (len(parts) - 1))
+    return ''.join(chunks)
 
 
 def _build_type_graph(schema):
@@ -48,28 +50,53 @@ def _find_field_chain(root_type, target_type, graph):
     return None
 
 
-def _resolve_attribute_path(type_name, attr_parts, schema):
+def _build_field_index(schema):
+    # type -> {lowercased field name: (actual name, base type)}; first match wins like the old scan
+    index = {}
+    for t, info in schema.get('types', {}).items():
+        lowered = {}
+        for fname, ftype in info.get('fields', {}).items():
+            base = ftype[:-2] if ftype.endswith('[]') else ftype
+            lowered.setdefault(fname.lower(), (fname, base))
+        index[t] = lowered
+    return index
+
+
+def _prepare_schema(schema):
+    cache = schema_cache(schema)
+    prepared = cache.get('graphql')
+    if prepared is None:
+        prepared = cache['graphql'] = {
+            'graph': _build_type_graph(schema),
+            'fields': _build_field_index(schema),
+            'chains': {},
+        }
+    return prepared
+
+
+def _cached_field_chain(prepared, root_type, target_type):
+    key = (root_type, target_type)
+    chains = prepared['chains']
+    if key not in chains:
+        chains[key] = _find_field_chain(root_type, target_type, prepared['graph'])
+    return chains[key]
+
+
+def _resolve_attribute_path(type_name, attr_parts, field_index):
     if not attr_parts:
         return []
-    types = schema.get('types', {})
     current_type = type_name
     resolved = []
     for idx, attr in enumerate(attr_parts):
-        type_info = types.get(current_type)
-        if not type_info:
+        fields = field_index.get(current_type)
+        if fields is None:
             return None
-        fields = type_info.get('fields', {})
-        field_name = None
-        for candidate in fields:
-            if candidate.lower() == attr.lower():
-                field_name = candidate
-                break
-        if not field_name:
+        match = fields.get(attr.lower())
+        if match is None:
             return None
+        field_name, base = match
         resolved.append(field_name)
-        ftype = fields[field_name]
-        base = ftype[:-2] if ftype.endswith('[]') else ftype
-        if base in types:
+        if base in field_index:
             current_type = base
         else:
             if idx < len(attr_parts) - 1:
@@ -92,7 +119,7 @@ def compile_graphql(plan, schema):
         # fallback to first root_query
         root_query = schema.get('root_queries', [])[0]
 
-    graph = _build_type_graph(schema)
+    prepared = _prepare_schema(schema)
 
     # group filters by top-level type after root
     where_parts = []
@@ -102,8 +129,8 @@ def compile_graphql(plan, schema):
         top = parts[0]
         rest = parts[1:]
 
-        chain = _find_field_chain(root_type, top, graph)
-        attr_path = _resolve_attribute_path(top, rest, schema)
+        chain = _cached_field_chain(prepared, root_type, top)
+        attr_path = _resolve_attribute_path(top, rest, prepared['fields'])
         if chain is None or attr_path is None:
             continue
 
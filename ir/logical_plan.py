@@ -1,19 +1,41 @@
 from dataclasses import dataclass
 from typing import List
 
-@dataclass
+
+def _freeze(value):
+    # hashable stand-in for filter values (dicts/lists as nested tuples); scalars are tagged with
+    # their type so 1, 1.0 and True stay distinct, as they did under the old json.dumps signature
+    if isinstance(value, dict):
+        return (dict, tuple(sorted((k, _freeze(v)) for k, v in value.items())))
+    if isinstance(value, (list, tuple)):
+        return (list, tuple(_freeze(v) for v in value))
+    return (type(value), value)
+
+
+@dataclass(slots=True, frozen=True)
 class Filter:
     field_path: str
     operator: str
     value: str
 
-@dataclass
+    def _key(self):
+        return (self.field_path, self.operator, _freeze(self.value))
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+@dataclass(slots=True, frozen=True)
 class Join:
     from_type: str
     to_type: str
     via: str
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LogicalPlan:
     root: str
     joins: List[Join]
@@ -0,0 +1,112 @@
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+# Shared child for primitive fields: nothing can be walked below it.
+LEAF: Mapping = MappingProxyType({})
+
+# id(obj) -> (obj, derived data); the object is held so ids cannot be recycled while cached
+_SCHEMA_CACHE = {}
+# the cypher compiler keys on schema['types'], so one schema can occupy two slots
+_SCHEMA_CACHE_SIZE = 16
+_MEMO_SIZE = 4096
+
+
+def schema_cache(obj) -> Dict[str, Any]:
+    """Return the dict of data derived from this schema object, creating it on first use.
+
+    Derived data lives here rather than on the schema, which is serialized verbatim into the
+    LLM prompt. Callers store under their own keys; the oldest object is evicted first.
+    """
+    entry = _SCHEMA_CACHE.get(id(obj))
+    if entry is None or entry[0] is not obj:
+        entry = (obj, {})
+        if len(_SCHEMA_CACHE) >= _SCHEMA_CACHE_SIZE:
+            _SCHEMA_CACHE.pop(next(iter(_SCHEMA_CACHE)))
+        _SCHEMA_CACHE[id(obj)] = entry
+    return entry[1]
+
+
+def build_trie(schema) -> Dict[str, Dict]:
+    """Return {type: node} where node maps field -> child node, or LEAF for primitives.
+
+    Nodes are shared per type, so relation cycles become cycles in the trie instead of
+    unbounded nesting; array suffixes are resolved here so lookups need no string work.
+    """
+    types = schema.get('types', {})
+    nodes = {t: {} for t in types}
+    for t, info in types.items():
+        node = nodes[t]
+        for name, ftype in info.get('fields', {}).items():
+            base = ftype[:-2] if ftype.endswith('[]') else ftype
+            node[name] = nodes.get(base, LEAF)
+    return nodes
+
+
+def _entry(schema):
+    # (trie, type names, per-path memo)
+    cache = schema_cache(schema)
+    entry = cache.get('trie')
+    if entry is None:
+        trie = build_trie(schema)
+        entry = cache['trie'] = (trie, frozenset(trie), {'exists': {}, 'unknown': {}})
+    return entry
+
+
+def schema_trie(schema) -> Dict[str, Dict]:
+    """Return the trie for this schema object, building it on first use."""
+    return _entry(schema)[0]
+
+
+def type_names(schema) -> frozenset:
+    """Return the schema's type names as a frozenset, built once per schema object."""
+    return _entry(schema)[1]
+
+
+def contains(trie, parts: Sequence[str]) -> bool:
+    """True when parts[0] is a type and every following part is a field reachable from it."""
+    node = trie.get(parts[0])
+    if node is None:
+        return False
+    for p in parts[1:]:
+        node = node.get(p)
+        if node is None:
+            return False
+    return True
+
+
+def path_exists(schema, field_path: str) -> bool:
+    """Memoized ``contains`` for a dotted path; repeated filter paths cost one dict hit."""
+    trie, _, memo = _entry(schema)
+    cache = memo['exists']
+    result = cache.get(field_path)
+    if result is None:
+        result = contains(trie, field_path.split('.'))
+        if len(cache) < _MEMO_SIZE:
+            cache[field_path] = result
+    return result
+
+
+def unknown_field(schema, field_path: str) -> Optional[str]:
+    """Return the first field that does not exist along the path, or None.
+
+    Walking stops at the first primitive, so anything after it is not checked. The caller
+    is expected to have verified that the leading type exists.
+    """
+    trie, _, memo = _entry(schema)
+    cache = memo['unknown']
+    if field_path in cache:
+        return cache[field_path]
+    parts = field_path.split('.')
+    missing = None
+    node = trie[parts[0]]
+    for p in parts[1:]:
+        child = node.get(p)
+        if child is None:
+            missing = p
+            break
+        if child is LEAF:
+            break
+        node = child
+    if len(cache) < _MEMO_SIZE:
+        cache[field_path] = missing
+    return missing
@@ -1,12 +1,21 @@
-def validate_plan(plan, schema):
-    """Validate that types/fields in the LogicalPlan exist in the schema."""
+from ir.schema_index import type_names, unknown_field
+
+
+def validate_plan(plan, schema, fail_fast=False):
+    """Validate that types/fields in the LogicalPlan exist in the schema.
+
+    Checks run root -> joins -> filters. With ``fail_fast`` the list holds at most the first error.
+    """
     errors = []
 
-    types = schema.get("types", {})
+    # boolean membership only; field lookups go through the memoized trie
+    types = type_names(schema)
 
     # validate root exists
     if plan.root not in types:
         errors.append(f"Unknown root type: {plan.root}")
+        if fail_fast:
+            return errors
 
     # validate joins
     for j in plan.joins:
@@ -14,29 +23,25 @@ def validate_plan(plan, schema):
             errors.append(f"Unknown join from type: {j.from_type}")
         if j.to_type not in types:
             errors.append(f"Unknown join to type: {j.to_type}")
+        if fail_fast and errors:
+            return errors[:1]
 
-    # validate filters
+    # validate filters; an unknown leading type is reported once, not per filter
+    unknown_types = set()
     for f in plan.filters:
-        parts = f.field_path.split('.')
-        t = parts[0]
+        t = f.field_path.split('.', 1)[0]
         if t not in types:
+            if t in unknown_types:
+                continue
+            unknown_types.add(t)
             errors.append(f"Filter references unknown type: {t}")
         else:
-            # walk fields
-            cur = types[t]['fields']
-            for p in parts[1:]:
-                # arrays may be represented as Name[]
-                if p not in cur:
-                    errors.append(f"Unknown field '{p}' on type {t}")
-                    break
-                # get next type if complex
-                ftype = cur[p]
-                if ftype.endswith('[]'):
-                    ftype = ftype[:-2]
-                if ftype in types:
-                    cur = types[ftype]['fields']
-                else:
-                    # primitive, stop walking
-                    break
+            # walk fields (memoized per schema); stops at the first primitive
+            missing = unknown_field(schema, f.field_path)
+            if missing is None:
+                continue
+            errors.append(f"Unknown field '{missing}' on type {t}")
+        if fail_fast:
+            return errors
 
     return errors
@@ -1,3 +1,4 @@
+import os
 from typing import List
 
 import spacy
@@ -5,22 +6,29 @@ from spacy.language import Language
 
 
 _SPACY_MODEL: Language | None = None
+# Only doc.ents is consumed downstream; keep tok2vec/transformer + ner and skip the rest.
+_EXCLUDED_COMPONENTS = ["tagger", "parser", "attribute_ruler", "lemmatizer"]
 
 
 def _get_spacy_model() -> Language:
     global _SPACY_MODEL
     if _SPACY_MODEL is None:
-        try:
-            _SPACY_MODEL = spacy.load("en_core_web_trf")
-        except OSError:
-            _SPACY_MODEL = spacy.load("en_core_web_sm")
+        if os.getenv("SPACY_USE_GPU", "0") == "1":
+            # Must run before spacy.load so the transformer weights land on the GPU.
+            spacy.require_gpu()
+        forced = os.getenv("NER_MODEL")
+        if forced:
+            # e.g. NER_MODEL=en_core_web_sm for low-latency CPU serving
+            _SPACY_MODEL = spacy.load(forced, exclude=_EXCLUDED_COMPONENTS)
+        else:
+            try:
+                _SPACY_MODEL = spacy.load("en_core_web_trf", exclude=_EXCLUDED_COMPONENTS)
+            except OSError:
+                _SPACY_MODEL = spacy.load("en_core_web_sm", exclude=_EXCLUDED_COMPONENTS)
     return _SPACY_MODEL
 
 
-def extract_mentions(text: str) -> List[dict]:
-    """Return spaCy entity spans for downstream agentic reasoning."""
-    model = _get_spacy_model()
-    doc = model(text)
+def _doc_mentions(doc) -> List[dict]:
     mentions: List[dict] = []
 
     for ent in doc.ents:
@@ -33,3 +41,16 @@ def extract_mentions(text: str) -> List[dict]:
         )
 
     return mentions
+
+
+def extract_mentions(text: str) -> List[dict]:
+    """Return spaCy entity spans for downstream agentic reasoning."""
+    model = _get_spacy_model()
+    return _doc_mentions(model(text))
+
+
+def extract_mentions_batch(texts: List[str]) -> List[List[dict]]:
+    """Batched extract_mentions: one nlp.pipe pass over all texts (batch size from NER_BATCH)."""
+    model = _get_spacy_model()
+    batch_size = int(os.getenv('NER_BATCH', '16'))
+    return [_doc_mentions(doc) for doc in model.pipe(texts, batch_size=batch_size)]
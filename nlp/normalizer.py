@@ -1,3 +1,5 @@
+import re
+
 STATE_NAME_MAP = {
     'california': 'CA',
     'new york': 'NY'
@@ -8,7 +10,22 @@ STATE_CODE_MAP = {
     'ny': 'NY'
 }
 
-KNOWN_STATE_CODES = set(STATE_NAME_MAP.values()) | set(STATE_CODE_MAP.values())
+KNOWN_STATE_CODES = frozenset(STATE_NAME_MAP.values()) | frozenset(STATE_CODE_MAP.values())
+
+_ACTIVE_STATUS = frozenset({'active', 'in network', 'participating'})
+
+_STATE_LOOKUP = {**STATE_NAME_MAP, **STATE_CODE_MAP}
+
+
+def _alternation(keys):
+    # longest first so multi-word names win over any shorter overlapping key
+    return '|'.join(map(re.escape, sorted(keys, key=len, reverse=True)))
+
+
+# state names may appear anywhere in the phrase (e.g., "Los Angeles California")
+_STATE_NAME_RE = re.compile(f"({_alternation(STATE_NAME_MAP)})")
+# two-letter codes only count as whole tokens separated by whitespace or commas
+_STATE_CODE_RE = re.compile(rf"(?<![^\s,])({_alternation(STATE_CODE_MAP)})(?![^\s,])")
 
 
 def normalize_state(text):
@@ -16,26 +33,19 @@ def normalize_state(text):
     if not t:
         return ''
 
-    if t in STATE_NAME_MAP:
-        return STATE_NAME_MAP[t]
-    if t in STATE_CODE_MAP:
-        return STATE_CODE_MAP[t]
-
-    # check if any multi-word state name appears inside the phrase (e.g., "Los Angeles California")
-    for name, code in STATE_NAME_MAP.items():
-        if name in t:
-            return code
+    code = _STATE_LOOKUP.get(t)
+    if code:
+        return code
 
-    # otherwise, scan tokens for two-letter codes
-    for token in t.replace(',', ' ').split():
-        if token in STATE_CODE_MAP:
-            return STATE_CODE_MAP[token]
+    match = _STATE_NAME_RE.search(t) or _STATE_CODE_RE.search(t)
+    if match:
+        return _STATE_LOOKUP[match.group(1)]
 
     return text.upper()
 
 
 def normalize_status(text):
     t = text.strip().lower()
-    if t in ('active', 'in network', 'participating'):
+    if t in _ACTIVE_STATUS:
         return 'ACTIVE'
     return text.upper()
@@ -1,59 +1,66 @@
-import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parent.parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from nlp.ner import extract_mentions
+from common.json_compat import loads as _json_loads
+from nlp.ner import extract_mentions, extract_mentions_batch
 from ir.logical_plan import LogicalPlan, Join, Filter
+from ir.schema_index import path_exists
 from ir.validator import validate_plan
 from compiler.graphql_compiler import compile_graphql
 from compiler.cypher_compiler import graphql_to_cypher
-from agentic.schema_reasoner import infer_filters
+from agentic.schema_reasoner import infer_filters, prefetch_filters
 
 
 def _flag_enabled(name: str) -> bool:
     return os.getenv(name, '0') == '1'
 
 
+@lru_cache(maxsize=8)
+def _load_schema_cached(path, mtime_ns):
+    with open(path, 'rb') as f:
+        return _json_loads(f.read())
+
+
 def load_schema(path='schema/schema.json'):
-    with open(path, 'r') as f:
-        return json.load(f)
+    """Return the parsed schema, re-reading the file only when its mtime changes.
+
+    The same dict is shared by every caller, which keeps per-schema caches warm; treat it as read-only.
+    """
+    return _load_schema_cached(path, os.stat(path).st_mtime_ns)
+
+
+_DEFAULT_SELECT = {'Provider': ('providerId', 'name')}
 
 
 def select_defaults_for_root(root):
-    if root == 'Provider':
-        return ['providerId', 'name']
-    return ['id']
+    return list(_DEFAULT_SELECT.get(root, ('id',)))
 
 
 def field_path_exists(field_path, schema):
-    parts = field_path.split('.')
-    types = schema.get('types', {})
-    if not parts:
-        return False
-    base = parts[0]
-    if base not in types:
-        return False
-    fields = types[base]['fields']
-    for p in parts[1:]:
-        if p not in fields:
-            return False
-        ftype = fields[p]
-        if ftype.endswith('[]'):
-            ftype = ftype[:-2]
-        if ftype in types:
-            fields = types[ftype]['fields']
-        else:
-            fields = {}
-    return True
+    return path_exists(schema, field_path)
 
 
-def build_plan_from_text(text, schema):
-    mentions = [] if _flag_enabled('ABLATION_DISABLE_NER') else extract_mentions(text)
+def _mentions_for(text):
+    return [] if _flag_enabled('ABLATION_DISABLE_NER') else extract_mentions(text)
+
+
+def mentions_for_many(texts):
+    """Mentions for several texts from one nlp.pipe pass (empty when ABLATION_DISABLE_NER=1)."""
+    if _flag_enabled('ABLATION_DISABLE_NER'):
+        return [[] for _ in texts]
+    return extract_mentions_batch(texts)
+
+
+def build_plan_from_text(text, schema, mentions=None):
+    if mentions is None:
+        mentions = _mentions_for(text)
     agent_filters = infer_filters(text, schema, mentions)
 
     # choose a root: prefer Provider if in schema
@@ -61,17 +68,18 @@ def build_plan_from_text(text, schema):
 
     # build joins: build simple path from root to any linked types
     joins = []
-    # naive: use schema relations directly to include typical joins
+    # naive: use schema relations directly to include typical joins; only relations leaving the root
+    # qualify, since every join appended here starts at the root
     relations = schema.get('relations', [])
     for a, b in relations:
-        if a == root or any(j.from_type == a for j in joins):
+        if a == root:
             # pick via name as the lowercase of b
             joins.append(Join(a, b, b.lower()))
 
     # build filters from mentions using intent mapping
     filters = []
     rejected_filters = []
-    filter_signatures = set()
+    seen_filters = set()
     for f in agent_filters:
         fp = f.get('field_path')
         op = f.get('operator', '=')
@@ -79,11 +87,11 @@ def build_plan_from_text(text, schema):
         if not fp or val is None:
             continue
         if field_path_exists(fp, schema):
-            signature = (fp, op, json.dumps(val, sort_keys=True))
-            if signature in filter_signatures:
+            candidate = Filter(fp, op, val)
+            if candidate in seen_filters:
                 continue
-            filters.append(Filter(fp, op, val))
-            filter_signatures.add(signature)
+            filters.append(candidate)
+            seen_filters.add(candidate)
         else:
             rejected_filters.append(fp)
 
@@ -92,12 +100,14 @@ def build_plan_from_text(text, schema):
     return LogicalPlan(root=root, joins=joins, filters=filters, select=select), rejected_filters
 
 
-def process(text, schema_path='schema/schema.json'):
-    schema = load_schema(schema_path)
-    plan, rejected_filters = build_plan_from_text(text, schema)
-    errors = [] if _flag_enabled('ABLATION_DISABLE_VALIDATION') else validate_plan(plan, schema)
+def process(text, schema_path='schema/schema.json', mentions=None, schema=None):
+    if schema is None:
+        schema = load_schema(schema_path)
+    plan, rejected_filters = build_plan_from_text(text, schema, mentions=mentions)
     if rejected_filters:
         raise ValueError(f"Rejected attributes not in schema: {sorted(set(rejected_filters))}")
+    # only the first error matters since the whole list is raised as one ValueError
+    errors = [] if _flag_enabled('ABLATION_DISABLE_VALIDATION') else validate_plan(plan, schema, fail_fast=True)
     if errors:
         raise ValueError(f"Logical plan validation failed: {errors}")
     if _flag_enabled('ABLATION_DISABLE_GRAPHQL'):
@@ -113,6 +123,38 @@ def process(text, schema_path='schema/schema.json'):
     }
 
 
+def process_many(texts, schema_path='schema/schema.json', max_workers=1, return_exceptions=False, schema=None):
+    """Run process() over many questions, yielding results in input order.
+
+    NER runs once over all texts through nlp.pipe and every first-attempt agent prompt is
+    dispatched in one concurrent batch; the remaining per-question steps run on up to
+    max_workers threads. With return_exceptions=True a failing question yields its exception
+    instead of aborting the batch.
+    """
+    texts = list(texts)
+    if schema is None:
+        schema = load_schema(schema_path)
+    mentions_list = mentions_for_many(texts)
+    try:
+        prefetch_filters(texts, schema, mentions_list)
+    except Exception:
+        if not return_exceptions:
+            raise
+        # the per-question calls below surface the same failure individually
+
+    def _process_one(item):
+        text, mentions = item
+        try:
+            return process(text, mentions=mentions, schema=schema)
+        except Exception as exc:
+            if return_exceptions:
+                return exc
+            raise
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        yield from executor.map(_process_one, zip(texts, mentions_list))
+
+
 if __name__ == '__main__':
     import sys
     text = ' '.join(sys.argv[1:]) or 'Find active providers in California hospitals'
@@ -1,20 +1,39 @@
 """FastAPI service exposing NL question to GraphQL/Cypher endpoints."""
 from __future__ import annotations
 
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 
+from pipeline.run import mentions_for_many
 from pipeline.run import process as run_pipeline
 
 
 DEFAULT_SCHEMA = Path("schema/schema.json").as_posix()
+BATCH_MAX = int(os.getenv("BATCH_MAX", "16"))
+BATCH_WAIT_MS = int(os.getenv("BATCH_WAIT_MS", "50"))
+# >0 runs the post-NER pipeline in a shared process pool instead of a thread, sidestepping the GIL.
+PIPELINE_PROCESSES = int(os.getenv("PIPELINE_PROCESSES", "0"))
+
+
+@asynccontextmanager
+async def _lifespan(_app: FastAPI):
+    yield
+    _shutdown_process_pool()
+
+
 app = FastAPI(
     title="text-to-gQL-cypher API",
     description="Convert natural-language healthcare queries into GraphQL or Cypher.",
     version="1.0.0",
+    lifespan=_lifespan,
 )
 
 
@@ -37,9 +56,109 @@ def _resolve_schema_path(requested: Optional[str]) -> str:
     return DEFAULT_SCHEMA
 
 
-def _run_question(question: str, schema_path: Optional[str]):
+def _set_exception_if_pending(future: asyncio.Future, exc: BaseException) -> None:
+    if not future.done():
+        future.set_exception(exc)
+
+
+class _MentionBatcher:
+    """Coalesce questions arriving within BATCH_WAIT_MS into one spaCy ``nlp.pipe`` pass."""
+
+    def __init__(self, max_size: int, wait_ms: int):
+        self._max_size = max(1, max_size)
+        self._wait = max(0, wait_ms) / 1000
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _ensure_running(self) -> None:
+        # Started lazily so it binds to whichever loop serves requests (uvicorn or TestClient).
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._task is not None and not self._task.done():
+            return
+        if self._loop is not loop:
+            # Questions still queued for the previous loop can never be drained here.
+            self._fail_queued(RuntimeError("Mention batcher restarted on a new event loop"))
+            self._loop = loop
+            self._queue = asyncio.Queue()
+        # On the same loop a dead drain task is simply replaced; it picks up whatever is queued.
+        self._task = loop.create_task(self._drain())
+
+    def _fail_queued(self, exc: BaseException) -> None:
+        if self._queue is None:
+            return
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            loop = future.get_loop()
+            if not future.done() and not loop.is_closed():
+                loop.call_soon_threadsafe(_set_exception_if_pending, future, exc)
+
+    async def submit(self, question: str) -> List[Dict[str, Any]]:
+        self._ensure_running()
+        future = self._loop.create_future()
+        await self._queue.put((question, future))
+        return await future
+
+    async def _drain(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[Tuple[str, asyncio.Future]] = [await self._queue.get()]
+            deadline = loop.time() + self._wait
+            while len(batch) < self._max_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                results = await asyncio.to_thread(mentions_for_many, [q for q, _ in batch])
+            except asyncio.CancelledError:
+                # Do not strand requests whose questions were already pulled off the queue.
+                for _, future in batch:
+                    _set_exception_if_pending(future, RuntimeError("Mention batcher stopped"))
+                raise
+            except Exception as exc:  # pragma: no cover - surfaced to every waiting request
+                for _, future in batch:
+                    _set_exception_if_pending(future, exc)
+                continue
+            for (_, future), mentions in zip(batch, results):
+                if not future.done():
+                    future.set_result(mentions)
+
+
+_BATCHER = _MentionBatcher(BATCH_MAX, BATCH_WAIT_MS)
+_PROCESS_POOL: Optional[ProcessPoolExecutor] = None
+
+
+def _process_pool() -> ProcessPoolExecutor:
+    global _PROCESS_POOL
+    if _PROCESS_POOL is None:
+        _PROCESS_POOL = ProcessPoolExecutor(max_workers=PIPELINE_PROCESSES)
+    return _PROCESS_POOL
+
+
+def _shutdown_process_pool() -> None:
+    global _PROCESS_POOL
+    if _PROCESS_POOL is not None:
+        _PROCESS_POOL.shutdown()
+        _PROCESS_POOL = None
+
+
+async def _run_off_loop(question: str, schema_path: str, mentions: List[Dict[str, Any]]):
+    call = partial(run_pipeline, question, schema_path=schema_path, mentions=mentions)
+    if PIPELINE_PROCESSES > 0:
+        return await asyncio.get_running_loop().run_in_executor(_process_pool(), call)
+    return await asyncio.to_thread(call)
+
+
+async def _run_question(question: str, schema_path: Optional[str]):
     try:
-        return run_pipeline(question, schema_path=_resolve_schema_path(schema_path))
+        mentions = await _BATCHER.submit(question)
+        # spaCy is done; the agent + compilers still block, so keep them off the event loop.
+        return await _run_off_loop(question, _resolve_schema_path(schema_path), mentions)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except Exception as exc:  # pragma: no cover - wide net for service stability
@@ -49,21 +168,21 @@ def _run_question(question: str, schema_path: Optional[str]):
 @app.post("/graphql", response_model=GraphQLResponse)
 async def graphql_endpoint(payload: QueryRequest) -> GraphQLResponse:
     """Return only the GraphQL translation for a natural-language question."""
-    result = _run_question(payload.question, payload.schema_path)
+    result = await _run_question(payload.question, payload.schema_path)
     return GraphQLResponse(graphql=result["query"].strip())
 
 
 @app.post("/cypher", response_model=CypherResponse)
 async def cypher_endpoint(payload: QueryRequest) -> CypherResponse:
     """Return only the Cypher translation for a natural-language question."""
-    result = _run_question(payload.question, payload.schema_path)
+    result = await _run_question(payload.question, payload.schema_path)
     return CypherResponse(cypher=result["cypher"].strip())
 
 
 @app.post("/both")
 async def combined_endpoint(payload: QueryRequest):
     """Return both GraphQL and Cypher for convenience when callers need both."""
-    result = _run_question(payload.question, payload.schema_path)
+    result = await _run_question(payload.question, payload.schema_path)
     return {
         "graphql": result["query"].strip(),
         "cypher": result["cypher"].strip(),
@@ -1,6 +1,8 @@
 """30-query regression harness for real agent evaluation."""
 
-from pipeline.run import process
+import os
+
+from pipeline.run import load_schema, process_many
 
 QUERIES = [
     "Find active cardiology providers in Los Angeles hospitals that accept Blue Shield",
@@ -38,15 +40,19 @@ QUERIES = [
 
 def main() -> int:
     results = []
-    for idx, text in enumerate(QUERIES, start=1):
+    # NER and first-attempt prompts are batched; questions then overlap up to the server's parallelism.
+    workers = max(1, int(os.getenv("OLLAMA_NUM_PARALLEL", "4")))
+    # Parse the schema once up front; spaCy is loaded by the batched NER pass before any question runs.
+    schema = load_schema()
+    outcomes = process_many(QUERIES, max_workers=workers, return_exceptions=True, schema=schema)
+    for idx, (text, res) in enumerate(zip(QUERIES, outcomes), start=1):
         print(f"\n[{idx:02d}] >>> {text}", flush=True)
-        try:
-            res = process(text)
+        if isinstance(res, Exception):
+            detail = str(res)
+            ok = False
+        else:
             detail = res["query"].strip()
             ok = True
-        except Exception as exc:  # pragma: no cover - dev-only harness
-            detail = str(exc)
-            ok = False
 
         status = "OK" if ok else "FAIL"
         snippet = detail.replace("\n", " ")[:200]
@@ -1,4 +1,16 @@
-from pipeline.run import process
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from agentic import ollama_client, schema_reasoner
+from compiler.cypher_compiler import graphql_to_cypher
+from compiler.graphql_compiler import compile_graphql
+from ir.logical_plan import Filter, Join, LogicalPlan
+from pipeline import run as pipeline_run
+from pipeline.run import load_schema, process, process_many
+from service import api
 
 
 def test_active_providers_ca():
@@ -8,3 +20,210 @@ def test_active_providers_ca():
     assert 'affiliations' in q
     assert 'status' in q
     assert '"ACTIVE"' in q or '"CA"' in q
+
+
+def _batch_reply(*entries):
+    return json.dumps({'results': list(entries)})
+
+
+def test_infer_filters_batch_uses_batched_answers(monkeypatch):
+    schema = load_schema('schema/schema.json')
+    reply = _batch_reply(
+        {'filters': [{'field_path': 'Specialty.name', 'operator': '=', 'value': 'Cardiology'}]},
+        {'filters': [{'field_path': 'Facility.location.state', 'operator': '=', 'value': 'TX'}]},
+    )
+    monkeypatch.setattr(schema_reasoner, 'run_ollama', lambda prompt: reply)
+    monkeypatch.setattr(schema_reasoner, 'infer_filters', lambda *a: pytest.fail('unexpected fallback'))
+
+    results = schema_reasoner.infer_filters_batch(['cardiologists', 'texas providers'], schema, [[], []])
+
+    assert results == [
+        [{'field_path': 'Specialty.name', 'operator': '=', 'value': 'Cardiology'}],
+        [{'field_path': 'Facility.location.state', 'operator': '=', 'value': 'TX'}],
+    ]
+
+
+def test_infer_filters_batch_falls_back_for_missing_or_invalid_entries(monkeypatch):
+    schema = load_schema('schema/schema.json')
+    reply = _batch_reply(
+        {'filters': [{'field_path': 'Specialty.name', 'operator': '=', 'value': 'Cardiology'}]},
+        {'filters': [{'field_path': 'Facility.bogus', 'operator': '=', 'value': 'x'}]},
+        'not an entry',
+    )
+    fallback_calls = []
+
+    def fake_infer(text, schema, mentions):
+        fallback_calls.append(text)
+        return [{'field_path': 'Provider.name', 'operator': '=', 'value': text}]
+
+    monkeypatch.setattr(schema_reasoner, 'run_ollama', lambda prompt: reply)
+    monkeypatch.setattr(schema_reasoner, 'infer_filters', fake_infer)
+
+    results = schema_reasoner.infer_filters_batch(['q1', 'q2', 'q3'], schema, [[], [], []])
+
+    assert fallback_calls == ['q2', 'q3']
+    assert results[0] == [{'field_path': 'Specialty.name', 'operator': '=', 'value': 'Cardiology'}]
+    assert results[1] == [{'field_path': 'Provider.name', 'operator': '=', 'value': 'q2'}]
+    assert results[2] == [{'field_path': 'Provider.name', 'operator': '=', 'value': 'q3'}]
+
+
+def test_infer_filters_batch_falls_back_when_reply_is_unparseable(monkeypatch):
+    schema = load_schema('schema/schema.json')
+    fallback_calls = []
+
+    def fake_infer(text, schema, mentions):
+        fallback_calls.append(text)
+        return []
+
+    monkeypatch.setattr(schema_reasoner, 'run_ollama', lambda prompt: 'Sorry, I cannot help with that.')
+    monkeypatch.setattr(schema_reasoner, 'infer_filters', fake_infer)
+
+    assert schema_reasoner.infer_filters_batch(['q1', 'q2'], schema, [[], []]) == [[], []]
+    assert fallback_calls == ['q1', 'q2']
+
+
+def test_infer_filters_batch_rejects_mismatched_lengths():
+    schema = load_schema('schema/schema.json')
+    with pytest.raises(ValueError):
+        schema_reasoner.infer_filters_batch(['q1', 'q2'], schema, [[]])
+
+
+def _echo_mentions(batches):
+    def fake_mentions_for_many(texts):
+        batches.append(list(texts))
+        return [[{'text': t, 'label': 'Q', 'span': (0, len(t))}] for t in texts]
+    return fake_mentions_for_many
+
+
+def test_api_batches_concurrent_questions_and_keeps_mentions_apart(monkeypatch):
+    batches = []
+    monkeypatch.setattr(api, 'mentions_for_many', _echo_mentions(batches))
+    monkeypatch.setattr(api, '_BATCHER', api._MentionBatcher(max_size=16, wait_ms=200))
+
+    def fake_pipeline(question, schema_path, mentions):
+        return {'query': mentions[0]['text'], 'cypher': question}
+
+    monkeypatch.setattr(api, 'run_pipeline', fake_pipeline)
+    questions = [f'question {i}' for i in range(6)]
+
+    async def ask_all():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            return await asyncio.gather(*(client.post('/graphql', json={'question': q}) for q in questions))
+
+    responses = asyncio.run(ask_all())
+
+    assert [r.status_code for r in responses] == [200] * len(questions)
+    assert [r.json()['graphql'] for r in responses] == questions
+    assert sorted(q for batch in batches for q in batch) == sorted(questions)
+    assert len(batches) < len(questions)
+
+
+def test_mention_batcher_recovers_queued_questions_after_drain_task_dies(monkeypatch):
+    batches = []
+    monkeypatch.setattr(api, 'mentions_for_many', _echo_mentions(batches))
+
+    async def scenario():
+        batcher = api._MentionBatcher(max_size=4, wait_ms=0)
+        assert await batcher.submit('first') == [{'text': 'first', 'label': 'Q', 'span': (0, 5)}]
+        batcher._task.cancel()
+        await asyncio.sleep(0)
+        stranded = asyncio.get_running_loop().create_future()
+        batcher._queue.put_nowait(('stranded', stranded))
+        second = await batcher.submit('second')
+        return await asyncio.wait_for(stranded, 1), second
+
+    stranded, second = asyncio.run(scenario())
+
+    assert stranded[0]['text'] == 'stranded'
+    assert second[0]['text'] == 'second'
+
+
+def test_cypher_filter_values_may_contain_colons():
+    schema = load_schema('schema/schema.json')
+    plan = LogicalPlan(
+        root='Provider',
+        joins=[Join('Provider', 'Facility', 'primaryFacility')],
+        filters=[Filter('Facility.location.city', '=', 'Los Angeles: East'), Filter('Provider.name', '=', 'Bob')],
+        select=['providerId', 'name'],
+    )
+    cypher = graphql_to_cypher(compile_graphql(plan, schema), schema)
+    assert ".city = 'Los Angeles: East'" in cypher
+    assert "root.name = 'Bob'" in cypher
+
+
+def test_process_many_matches_sequential_process(monkeypatch):
+    monkeypatch.setenv('MOCK_OLLAMA', '1')
+    questions = [
+        'Find active cardiology providers in Los Angeles hospitals that accept Blue Shield',
+        'Show inactive oncology clinics in Seattle',
+        'List providers accepting Cigna Choice plan in Texas',
+        'Find providers with open appointments in Austin urgent care centers',
+    ]
+    expected = [process(q) for q in questions]
+
+    results = list(process_many(questions, max_workers=4))
+
+    assert [r['text'] for r in results] == questions
+    assert [r['cypher'] for r in results] == [e['cypher'] for e in expected]
+    assert [r['query'] for r in results] == [e['query'] for e in expected]
+
+
+def _stream(*pieces):
+    return [json.dumps({'response': p, 'done': False}).encode() for p in pieces] + [b'{"response":"","done":true}']
+
+
+def test_read_until_json_closes_ignores_braces_inside_strings():
+    reply = '{"filters":[{"field_path":"Provider.name","operator":"=","value":"a}b"}]}'
+    assert ollama_client._read_until_json_closes(_stream(reply)) == reply
+
+
+def test_read_until_json_closes_joins_an_object_split_across_chunks():
+    reply = '{"filters":[{"field_path":"Specialty.name","operator":"=","value":"Cardiology"}]}'
+    chunks = _stream(reply[:7], reply[7:30], reply[30:61], reply[61:])
+    assert ollama_client._read_until_json_closes(chunks) == reply
+
+
+def test_read_until_json_closes_drops_trailing_chatter():
+    reply = '{"filters":[]}'
+    chunks = _stream('Here you go: ', reply[:5], reply[5:] + ' Let me know if', ' you need {more}.')
+    assert ollama_client._read_until_json_closes(chunks) == 'Here you go: ' + reply
+
+
+def test_read_until_json_closes_raises_on_error_chunk():
+    chunks = _stream('{"filt')[:1] + [b'{"error":"model runner has unexpectedly stopped"}']
+    with pytest.raises(ollama_client.OllamaUnavailableError, match='unexpectedly stopped'):
+        ollama_client._read_until_json_closes(chunks)
+
+
+def test_filters_with_equal_but_differently_typed_values_stay_distinct():
+    filters = {Filter('a', '=', 1), Filter('a', '=', 1.0), Filter('a', '=', True)}
+    assert len(filters) == 3
+    assert Filter('a', '=', 1) != Filter('a', '=', True)
+    assert Filter('a', '=', 1) != Filter('a', '=', 1.0)
+    assert Filter('a', '=', {'x': 1, 'y': [1, 2]}) == Filter('a', '=', {'y': [1, 2], 'x': 1})
+    assert len({Filter('a', '=', {'x': 1, 'y': 2}), Filter('a', '=', {'y': 2, 'x': 1})}) == 1
+
+
+def test_build_plan_from_text_drops_exact_duplicate_filters(monkeypatch):
+    schema = load_schema('schema/schema.json')
+    agent_filters = [
+        {'field_path': 'ProviderRating.reviewCount', 'operator': '=', 'value': 1},
+        {'field_path': 'ProviderRating.reviewCount', 'operator': '=', 'value': 1},
+        {'field_path': 'ProviderRating.reviewCount', 'operator': '=', 'value': 1.0},
+        {'field_path': 'ProviderRating.reviewCount', 'operator': '=', 'value': True},
+        {'field_path': 'Specialty.name', 'operator': '=', 'value': 'Cardiology'},
+        {'field_path': 'Specialty.name', 'operator': '=', 'value': 'Cardiology'},
+    ]
+    monkeypatch.setattr(pipeline_run, 'infer_filters', lambda text, schema, mentions: agent_filters)
+
+    plan, rejected = pipeline_run.build_plan_from_text('ignored', schema, mentions=[])
+
+    assert rejected == []
+    assert [(f.field_path, f.value) for f in plan.filters] == [
+        ('ProviderRating.reviewCount', 1),
+        ('ProviderRating.reviewCount', 1.0),
+        ('ProviderRating.reviewCount', True),
+        ('Specialty.name', 'Cardiology'),
+    ]
+    assert [type(f.value) for f in plan.filters[:3]] == [int, float, bool]